@@ -1,19 +1,87 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, make_response
 from flask_sqlalchemy import SQLAlchemy
+from flask_caching import Cache
+from flask_session import Session
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import selectinload, joinedload, raiseload
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import hmac
+import os
+import re
+import sqlite3
+import redis
 
 # Initialize the Flask application
 app = Flask(__name__)
 
 # Configure the database connection
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///hospital.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///hospital.db') # Tests point this at sqlite://
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Build engine options for the given database URI. Only pooled engines accept the
+# pool size knobs: in-memory SQLite gets a StaticPool, which rejects them.
+def engine_options(uri):
+    url = make_url(uri)
+    options = {
+        'pool_pre_ping': False, # Skip the extra liveness round-trip on every checkout
+        'query_cache_size': 1200, # Compiled statement cache, above the default 500
+        'pool_recycle': 1800,
+    }
+    if url.get_backend_name() == 'sqlite':
+        options['connect_args'] = {'check_same_thread': False, 'timeout': 30}
+        if url.database in (None, '', ':memory:'):
+            return options
+    # Size the connection pool for concurrent workers (SQLite file databases use QueuePool too)
+    options['pool_size'] = 10
+    options['max_overflow'] = 20
+    return options
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SECRET_KEY'] = 'your_super_secret_key_here_HMA' # Essential for sessions and flash messages
 
+# Keep session data in Redis; the cookie only carries the session id
+app.config['SESSION_TYPE'] = 'redis'
+app.config['SESSION_REDIS'] = redis.Redis()
+
+# In-process cache for dev; point this at Redis in production, e.g.
+# app.config['CACHE_TYPE'] = 'RedisCache'
+# app.config['CACHE_REDIS_URL'] = 'redis://localhost:6379/0'
+app.config['CACHE_TYPE'] = 'SimpleCache'
+app.config['CACHE_DEFAULT_TIMEOUT'] = 600
+
+# Password hashing knobs. Leave these unset in production so Werkzeug's strong
+# default (scrypt) is used; dev/CI can switch to a cheaper method, e.g.
+# app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+# app.config['PASSWORD_HASH_SALT_LENGTH'] = 16
+
 # Initialize the SQLAlchemy extension
 db = SQLAlchemy(app)
 
+# Initialize the caching extension
+cache = Cache(app)
+
+# Initialize server-side sessions
+Session(app)
+
+# Enable WAL so readers don't block on the writer, and relax fsyncs to once per checkpoint
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.close()
+
 # This makes the datetime object available in all Jinja templates
 @app.context_processor
 def inject_datetime():
@@ -22,17 +90,47 @@ def inject_datetime():
 
 # ----------------- Models -----------------
 
+# Remember recent successful password checks so repeated logins skip the KDF.
+# Only successes are kept, keyed on the stored hash plus an HMAC of the password
+# (never the plaintext), so a changed password simply stops matching. The HMAC key
+# is random per process and never leaves it, so entries can't be brute-forced
+# with a known key.
+_VERIFIED_MAXSIZE = 1024
+_VERIFY_KEY = os.urandom(32)
+_verified = OrderedDict()
+_verified_lock = Lock()
+
+def _verify(stored_hash, password):
+    digest = hmac.new(_VERIFY_KEY, password.encode(), hashlib.sha256).digest()
+    key = (stored_hash, digest)
+    with _verified_lock:
+        if key in _verified:
+            _verified.move_to_end(key)
+            return True
+
+    if not check_password_hash(stored_hash, password):
+        return False
+
+    with _verified_lock:
+        _verified[key] = None
+        if len(_verified) > _VERIFIED_MAXSIZE:
+            _verified.popitem(last=False)
+    return True
+
 class Department(db.Model):
     __tablename__ = 'departments'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), unique=True, nullable=False)
     description = db.Column(db.Text)
     
-    doctors = db.relationship('User', backref='specialization', lazy='dynamic', foreign_keys='User.specialization_id')
-    appointments = db.relationship('Appointment', backref='department_rel', lazy='dynamic') 
+    doctors = db.relationship('User', back_populates='specialization', lazy='dynamic', foreign_keys='User.specialization_id')
+    appointments = db.relationship('Appointment', back_populates='department_rel', lazy='dynamic')
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role_spec', 'role', 'specialization_id'), # Doctor lookup in book_appointment
+    )
     id = db.Column(db.Integer, primary_key=True)
     specialization_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=True)
     
@@ -46,20 +144,24 @@ class User(db.Model):
     email = db.Column(db.String(150), unique=True, nullable=False)
     password_hash = db.Column(db.String(150), nullable=False) # Store hash, not raw password
     role = db.Column(db.String(150), nullable=False) # admin, doctor, patient
-    created_at = db.Column(db.DateTime, default=datetime.utcnow) 
+    created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(), nullable=False) # Filled in by the database
+
+    specialization = db.relationship('Department', back_populates='doctors', foreign_keys=[specialization_id])
 
     # Helper function to set password
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+    def set_password(self, password, method=None):
+        method = method or app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        salt_length = app.config.get('PASSWORD_HASH_SALT_LENGTH', 16)
+        self.password_hash = generate_password_hash(password, method=method, salt_length=salt_length)
 
     # Helper function to check password
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return _verify(self.password_hash, password)
     
     # Appointments relationship (patient/user side)
-    patient_appointments = db.relationship('Appointment', backref='patient', lazy='dynamic', foreign_keys='Appointment.patient_id')
+    patient_appointments = db.relationship('Appointment', back_populates='patient', lazy='dynamic', foreign_keys='Appointment.patient_id')
     # Appointments relationship (doctor side - assuming only doctors are assigned appointments)
-    doctor_appointments = db.relationship('Appointment', backref='doctor', lazy='dynamic', foreign_keys='Appointment.doctor_id')
+    doctor_appointments = db.relationship('Appointment', back_populates='doctor', lazy='dynamic', foreign_keys='Appointment.doctor_id')
 
 
 class Treatment(db.Model):
@@ -68,11 +170,17 @@ class Treatment(db.Model):
     treatment_name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text)
     
-    appointments = db.relationship('Appointment', backref='treatment', lazy='dynamic')
+    appointments = db.relationship('Appointment', back_populates='treatment', lazy='dynamic')
 
 
 class Appointment(db.Model):
     __tablename__ = 'appointments'
+    __table_args__ = (
+        # Match the dashboard filters so ORDER BY appointment_datetime is served from the index
+        db.Index('ix_appt_doctor_dt', 'doctor_id', 'appointment_datetime'),
+        # Also serves the patient dashboard, and stops a double-submitted booking
+        db.Index('uq_patient_slot', 'patient_id', 'appointment_datetime', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     appointment_datetime = db.Column(db.DateTime, nullable=False) 
     status = db.Column(db.String(21), default='Booked') # Status: Booked, Completed, Cancelled
@@ -83,6 +191,26 @@ class Appointment(db.Model):
     treatment_id = db.Column(db.Integer, db.ForeignKey('treatments.id'), nullable=False)
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=False) # Department needed for booking logic
 
+    # Many-to-one sides of the relationships declared on User, Treatment and Department
+    patient = db.relationship('User', back_populates='patient_appointments', foreign_keys=[patient_id])
+    doctor = db.relationship('User', back_populates='doctor_appointments', foreign_keys=[doctor_id])
+    treatment = db.relationship('Treatment', back_populates='appointments')
+    department_rel = db.relationship('Department', back_populates='appointments')
+
+# ----------------- Cached Lookups -----------------
+
+# Departments and treatments rarely change, so serve them from the cache.
+# Plain dicts are cached so no ORM objects outlive their session.
+@cache.memoize(timeout=600)
+def _all_departments():
+    rows = db.session.execute(db.select(Department.id, Department.name).order_by(Department.id))
+    return [dict(row) for row in rows.mappings()]
+
+@cache.memoize(timeout=600)
+def _all_treatments():
+    rows = db.session.execute(db.select(Treatment.id, Treatment.treatment_name).order_by(Treatment.id))
+    return [dict(row) for row in rows.mappings()]
+
 # ----------------- Routes -----------------
 
 def is_logged_in():
@@ -94,6 +222,25 @@ def home():
         return redirect(url_for('dashboard'))
     return redirect(url_for('login'))
 
+# The anonymous login and register pages are identical for every visitor, so
+# keep the rendered HTML in the cache. Pending flash messages and the logged-in
+# navbar are part of the page, so skip the cache whenever either applies.
+def _skip_page_cache():
+    return '_flashes' in session or is_logged_in()
+
+@cache.memoize(timeout=300, unless=_skip_page_cache)
+def _render_page(template):
+    return render_template(template)
+
+# Serve a cacheable page with an ETag so repeat views get 304 Not Modified
+def _conditional_page(template):
+    response = make_response(_render_page(template))
+    response.add_etag()
+    return response.make_conditional(request)
+
+# Built once at import so every login reuses the same compiled SQL from the cache
+_LOGIN_STMT = db.select(User).where(User.username == db.bindparam('u')).limit(1)
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if is_logged_in():
@@ -102,20 +249,26 @@ def login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
-        
-        user = User.query.filter_by(username=username).first()
+
+        # Reject empty submissions before touching the database
+        if not username or not password:
+            flash('Please enter both username and password.', 'warning')
+            return render_template('login.html')
+
+        user = db.session.execute(_LOGIN_STMT, {'u': username}).scalar_one_or_none()
         
         if user and user.check_password(password):
             session['logged_in'] = True
             session['user_id'] = user.id
             session['role'] = user.role
+            session['first_name'] = user.first_name # Lets the dashboard greet without re-fetching the user
             flash(f'Welcome back, {user.first_name}!', 'success')
             return redirect(url_for('dashboard'))
         else:
             flash('Invalid username or password.', 'danger')
             return render_template('login.html')
 
-    return render_template('login.html')
+    return _conditional_page('login.html')
 
 @app.route('/logout')
 def logout():
@@ -145,8 +298,17 @@ def register():
             db.session.rollback()
             flash(f'Error during registration: {e}', 'danger')
 
-    return render_template('register.html')
+    return _conditional_page('register.html')
+
 
+# Eager-loading options for the dashboard queries. In debug and testing, any
+# relationship that wasn't loaded explicitly raises instead of lazy loading,
+# so N+1 regressions fail loudly.
+def _dashboard_options(*loaders):
+    opts = list(loaders)
+    if app.debug or app.testing:
+        opts.append(raiseload('*'))
+    return opts
 
 @app.route('/dashboard')
 def dashboard():
@@ -155,32 +317,72 @@ def dashboard():
         return redirect(url_for('login'))
     
     user_id = session['user_id']
-    user = User.query.get(user_id)
-    
-    if user.role == 'admin':
+    role = session['role']
+
+    if role in ('admin', 'patient') and 'first_name' in session:
+        # These views only use the User for the greeting, so skip loading the row
+        user = {'first_name': session['first_name'], 'role': role}
+    else:
+        user = db.session.get(User, user_id)
+
+    if role == 'admin':
         # Admin dashboard logic: count users, appointments, etc.
-        user_count = User.query.count()
-        appointment_count = Appointment.query.count()
-        dept_count = Department.query.count()
+        # Fetch all three totals in a single round-trip using scalar subqueries
+        user_count, appointment_count, dept_count = db.session.execute(db.select(
+            db.select(db.func.count()).select_from(User).scalar_subquery().label('u'),
+            db.select(db.func.count()).select_from(Appointment).scalar_subquery().label('a'),
+            db.select(db.func.count()).select_from(Department).scalar_subquery().label('d')
+        )).one()
         context = {
             'user': user,
             'user_count': user_count,
             'appointment_count': appointment_count,
             'dept_count': dept_count,
-            'recent_appointments': Appointment.query.order_by(Appointment.appointment_datetime.desc()).limit(5).all()
+            # Only five rows: batch every relationship with IN (...) lookups so the
+            # root query stays narrow instead of joining in wide duplicated rows
+            'recent_appointments': Appointment.query.options(*_dashboard_options(
+                selectinload(Appointment.patient),
+                selectinload(Appointment.doctor),
+                selectinload(Appointment.treatment),
+                selectinload(Appointment.department_rel)
+            )).order_by(Appointment.appointment_datetime.desc()).limit(5).all()
         }
-    elif user.role == 'doctor':
+    elif role == 'doctor':
         # Doctor dashboard logic: view assigned appointments
-        appointments = Appointment.query.filter_by(doctor_id=user_id).order_by(Appointment.appointment_datetime.asc()).all()
+        # Eager-load everything the template touches so the list costs a fixed number of queries:
+        # JOIN the small lookup tables and batch-load the patients with selectinload
+        appointments = Appointment.query.options(*_dashboard_options(
+            selectinload(Appointment.patient),
+            joinedload(Appointment.treatment),
+            joinedload(Appointment.department_rel)
+        )).filter_by(doctor_id=user_id).order_by(Appointment.appointment_datetime.asc()).all()
         context = {
             'user': user,
             'appointments': appointments
         }
-    elif user.role == 'patient':
+    elif role == 'patient':
         # Patient dashboard logic: view their own appointments
-        appointments = Appointment.query.filter_by(patient_id=user_id).order_by(Appointment.appointment_datetime.asc()).all()
-        departments = Department.query.all()
-        treatments = Treatment.query.all()
+        # Select just the displayed columns so the template iterates plain mappings
+        appointments = db.session.execute(
+            db.select(
+                Appointment.id,
+                Appointment.appointment_datetime,
+                Appointment.status,
+                Treatment.treatment_name,
+                Department.name.label('department_name'),
+                User.first_name.label('doctor_first')
+            )
+            .select_from(Appointment)
+            # Outer joins keep appointments whose treatment/department row has gone missing
+            # (SQLite doesn't enforce the foreign keys), as the ORM relationships did
+            .outerjoin(Treatment, Treatment.id == Appointment.treatment_id)
+            .outerjoin(Department, Department.id == Appointment.department_id)
+            .outerjoin(User, User.id == Appointment.doctor_id)
+            .where(Appointment.patient_id == user_id)
+            .order_by(Appointment.appointment_datetime.asc())
+        ).mappings().all()
+        departments = _all_departments()
+        treatments = _all_treatments()
         context = {
             'user': user,
             'appointments': appointments,
@@ -207,6 +409,7 @@ def manage_departments():
             new_dept = Department(name=name, description=description)
             db.session.add(new_dept)
             db.session.commit()
+            cache.delete_memoized(_all_departments)
             flash(f'Department "{name}" added successfully.', 'success')
         except Exception as e:
             db.session.rollback()
@@ -216,6 +419,9 @@ def manage_departments():
     departments = Department.query.all()
     return render_template('admin_departments.html', departments=departments)
 
+# The value shape a datetime-local input submits
+_DATETIME_LOCAL_RE = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2})?', re.ASCII)
+
 # Placeholder route for appointment booking
 @app.route('/book_appointment', methods=['POST'])
 def book_appointment():
@@ -229,23 +435,47 @@ def book_appointment():
         treatment_id = request.form['treatment_id']
         # Simple datetime parsing (You should use a proper date/time picker in the UI)
         app_dt_str = request.form['appointment_datetime']
-        app_dt = datetime.strptime(app_dt_str, '%Y-%m-%dT%H:%M') # Format from datetime-local input
-        
+        # fromisoformat also takes dates, offsets, week dates and other ISO forms, so only
+        # let through what datetime-local produces (YYYY-MM-DDTHH:MM, optionally with :SS)
+        try:
+            if not _DATETIME_LOCAL_RE.fullmatch(app_dt_str):
+                raise ValueError(app_dt_str)
+            app_dt = datetime.fromisoformat(app_dt_str) # Parsed natively in C
+        except ValueError:
+            flash('Please choose a valid date and time.', 'danger')
+            return redirect(url_for('dashboard'))
+
+        # Validate both foreign keys in one round-trip before attempting the INSERT
+        dept_ok, treatment_ok = db.session.execute(db.select(
+            db.exists().where(Department.id == dept_id),
+            db.exists().where(Treatment.id == treatment_id)
+        )).one()
+        if not (dept_ok and treatment_ok):
+            flash('Please choose a valid department and treatment.', 'danger')
+            return redirect(url_for('dashboard'))
+
         # Simple auto-assignment of doctor (This needs proper scheduling logic in a real app)
-        available_doctor = User.query.filter_by(role='doctor', specialization_id=dept_id).first()
+        # Only the id is needed, which ix_users_role_spec can answer without reading the row
+        doctor_id = db.session.scalar(
+            db.select(User.id).where(User.role == 'doctor', User.specialization_id == dept_id).limit(1)
+        )
         
-        new_appointment = Appointment(
+        # A duplicate (patient, time slot) is dropped by the unique index instead of raising
+        stmt = sqlite_insert(Appointment).values(
             patient_id=session['user_id'],
-            doctor_id=available_doctor.id if available_doctor else None, # Assign if doctor exists
+            doctor_id=doctor_id, # None if no doctor exists for the department
             treatment_id=treatment_id,
             department_id=dept_id,
             appointment_datetime=app_dt,
             status='Booked'
-        )
-        
-        db.session.add(new_appointment)
+        ).on_conflict_do_nothing(index_elements=['patient_id', 'appointment_datetime'])
+
+        result = db.session.execute(stmt)
         db.session.commit()
-        flash('Appointment booked successfully! A doctor will be assigned shortly.', 'success')
+        if result.rowcount == 0:
+            flash('You already have an appointment booked for that time.', 'warning')
+        else:
+            flash('Appointment booked successfully! A doctor will be assigned shortly.', 'success')
 
     except Exception as e:
         db.session.rollback()
@@ -255,48 +485,103 @@ def book_appointment():
 
 # ----------------- DB Initialization -----------------
 
+# db.create_all() never alters existing tables, so bring databases created by
+# older versions of the models in line with them. Every step is a no-op once applied.
+def upgrade_schema():
+    # Inspect through the session's connection so checking the schema can't roll back
+    # the steps already issued in this transaction
+    inspector = db.inspect(db.session.connection())
+
+    # uq_patient_slot can't be built over double bookings made before it existed:
+    # keep the earliest booking for each (patient, time slot) and drop the rest
+    if 'uq_patient_slot' not in {ix['name'] for ix in inspector.get_indexes('appointments')}:
+        keep = (
+            db.select(db.func.min(Appointment.id))
+            .group_by(Appointment.patient_id, Appointment.appointment_datetime)
+        )
+        result = db.session.execute(db.delete(Appointment).where(Appointment.id.not_in(keep)))
+        if result.rowcount:
+            app.logger.warning('Removed %d duplicate appointment bookings before adding uq_patient_slot', result.rowcount)
+
+    # Indexes added to the models after their tables were first created
+    for table in (User.__table__, Appointment.__table__):
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            db.session.execute(CreateIndex(index, if_not_exists=True))
+
+    # SQLite can't add a column default in place, so users tables created before
+    # created_at had a server default get a trigger that fills it in, and rows
+    # inserted without one are backfilled
+    columns = {c['name']: c for c in inspector.get_columns('users')}
+    if db.engine.dialect.name == 'sqlite' and columns['created_at']['default'] is None:
+        db.session.execute(db.text(
+            "CREATE TRIGGER IF NOT EXISTS users_created_at_default AFTER INSERT ON users "
+            "WHEN NEW.created_at IS NULL "
+            "BEGIN UPDATE users SET created_at = CURRENT_TIMESTAMP WHERE id = NEW.id; END"
+        ))
+        db.session.execute(
+            db.update(User).where(User.created_at.is_(None)).values(created_at=db.func.current_timestamp())
+        )
+
+    db.session.commit()
+
 # Utility function to initialize and populate the database with seed data
 def seed_data():
-    if not Department.query.first():
-        db.session.add(Department(name="Cardiology", description="Heart-related issues."))
-        db.session.add(Department(name="Neurology", description="Nervous system disorders."))
-        db.session.add(Department(name="Orthopaedics", description="Musculoskeletal system."))
-        db.session.commit()
-
-    if not Treatment.query.first():
-        db.session.add(Treatment(treatment_name="Consultation", description="General check-up."))
-        db.session.add(Treatment(treatment_name="EKG", description="Electrocardiogram."))
-        db.session.add(Treatment(treatment_name="MRI Scan", description="Magnetic Resonance Imaging."))
-        db.session.add(Treatment(treatment_name="Knee Surgery", description="Total Knee Replacement."))
-        db.session.commit()
+    # Sample accounts only need a cheap hash when running the dev server
+    seed_hash_method = 'pbkdf2:sha256:1000' if app.debug else None
+
+    # Probe all four seed targets in one round-trip without loading any rows
+    has_dept, has_treat, has_admin, has_doc = db.session.execute(db.select(
+        db.exists().where(Department.id.is_not(None)),
+        db.exists().where(Treatment.id.is_not(None)),
+        db.exists().where(User.username == "admin"),
+        db.exists().where(User.username == "doctor")
+    )).one()
+
+    if not has_dept:
+        db.session.execute(insert(Department), [
+            {'name': "Cardiology", 'description': "Heart-related issues."},
+            {'name': "Neurology", 'description': "Nervous system disorders."},
+            {'name': "Orthopaedics", 'description': "Musculoskeletal system."},
+        ])
+
+    if not has_treat:
+        db.session.execute(insert(Treatment), [
+            {'treatment_name': "Consultation", 'description': "General check-up."},
+            {'treatment_name': "EKG", 'description': "Electrocardiogram."},
+            {'treatment_name': "MRI Scan", 'description': "Magnetic Resonance Imaging."},
+            {'treatment_name': "Knee Surgery", 'description': "Total Knee Replacement."},
+        ])
 
     # Create admin if it doesn't exist
-    if not User.query.filter_by(username="admin").first():
+    if not has_admin:
         admin_user = User(
             first_name="System", last_name="admin", username="admin", email="11d@gmail.com", role="admin"
         )
-        admin_user.set_password("admin") # Use a strong password in a real app
+        admin_user.set_password("admin", method=seed_hash_method) # Use a strong password in a real app
         db.session.add(admin_user)
-        db.session.commit()
     
     # Create sample doctor if it doesn't exist
-    if not User.query.filter_by(username="doctor").first():
-        cardiology_dept = Department.query.filter_by(name="Cardiology").first()
-        if cardiology_dept:
+    if not has_doc:
+        cardiology_id = db.session.scalar(db.select(Department.id).where(Department.name == "Cardiology"))
+        if cardiology_id:
             doctor_user = User(
                 first_name="doctor", last_name="doctor", username="doctor", email="doc@gmail.com", role="doctor",
-                specialization_id=cardiology_dept.id
+                specialization_id=cardiology_id
             )
-            doctor_user.set_password("doctor")
+            doctor_user.set_password("doctor", method=seed_hash_method)
             db.session.add(doctor_user)
-            db.session.commit()
+
+    # One commit covers every insert above
+    db.session.commit()
 
 # Run app and create database
 if __name__ == '__main__':
+    app.debug = True # Set before seeding so app.debug is visible to seed_data()
     with app.app_context():
         # Drop and recreate tables for easy development (Remove in production)
         # db.drop_all() 
         db.create_all()
+        upgrade_schema() # Bring tables created by older versions in line with the models
         seed_data() # Populate with initial data
 
     app.run(debug=True)
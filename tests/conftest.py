@@ -0,0 +1,123 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Must be set before app.py is imported: the engine is created at import time
+os.environ['DATABASE_URL'] = 'sqlite://'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeredis
+import pytest
+from sqlalchemy import event
+
+import app as hms
+
+
+@pytest.fixture
+def app():
+    hms.app.config.update(TESTING=True, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    hms.app.session_interface.client = fakeredis.FakeRedis()
+
+    with hms.app.app_context():
+        hms.db.create_all()
+        hms.upgrade_schema()
+        hms.seed_data()
+    hms.cache.clear()
+
+    yield hms.app
+
+    with hms.app.app_context():
+        hms.db.session.remove()
+        hms.db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# Count every SQL statement sent to the database while the test runs
+@pytest.fixture
+def query_counter(app):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = hms.db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', count)
+
+
+# Log the test client in as the given user without going through /login
+@pytest.fixture
+def login(app, client):
+    def _login(username):
+        with app.app_context():
+            user = hms.db.session.scalar(hms.db.select(hms.User).where(hms.User.username == username))
+            with client.session_transaction() as sess:
+                sess['logged_in'] = True
+                sess['user_id'] = user.id
+                sess['role'] = user.role
+                sess['first_name'] = user.first_name
+    return _login
+
+
+# Create a patient account and return its id
+@pytest.fixture
+def make_patient(app):
+    def _make(username='patient'):
+        with app.app_context():
+            patient = hms.User(
+                first_name='Pat', last_name='Ient', username=username, email=f'{username}@example.com', role='patient'
+            )
+            patient.set_password('patient')
+            hms.db.session.add(patient)
+            hms.db.session.commit()
+            return patient.id
+    return _make
+
+
+# Create `count` appointments spread over the seeded departments and treatments.
+# `patient`/`doctor` name existing accounts to use for every appointment; None
+# gives each appointment its own new account, so a per-row lazy load can't be
+# answered from the identity map after the first row.
+@pytest.fixture
+def make_appointments(app, make_patient):
+    def _make(count, patient=None, doctor='doctor'):
+        with app.app_context():
+            start = datetime(2026, 11, 1, 9, 0)
+            for i in range(count):
+                if patient is None:
+                    patient_id = make_patient(f'patient{i}')
+                else:
+                    patient_id = _user_id(patient)
+
+                if doctor is None:
+                    new_doctor = hms.User(
+                        first_name='Doc', last_name=f'Tor{i}', username=f'doctor{i}', email=f'doctor{i}@example.com',
+                        role='doctor', specialization_id=1 + i % 3
+                    )
+                    new_doctor.set_password('doctor')
+                    hms.db.session.add(new_doctor)
+                    hms.db.session.flush()
+                    doctor_id = new_doctor.id
+                else:
+                    doctor_id = _user_id(doctor)
+
+                hms.db.session.add(hms.Appointment(
+                    patient_id=patient_id,
+                    doctor_id=doctor_id,
+                    treatment_id=1 + i % 4,
+                    department_id=1 + i % 3,
+                    appointment_datetime=start + timedelta(hours=i),
+                    status='Booked'
+                ))
+            hms.db.session.commit()
+    return _make
+
+
+def _user_id(username):
+    return hms.db.session.scalar(hms.db.select(hms.User.id).where(hms.User.username == username))
@@ -0,0 +1,65 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+import app as hms
+
+
+@pytest.fixture
+def stored_hash(app):
+    hms._verified.clear()
+    yield generate_password_hash('secret', method='pbkdf2:sha256:1000')
+    hms._verified.clear()
+
+
+@pytest.fixture
+def kdf_calls(monkeypatch):
+    calls = []
+    real_check = hms.check_password_hash
+
+    def counting_check(pwhash, password):
+        calls.append(pwhash)
+        return real_check(pwhash, password)
+
+    monkeypatch.setattr(hms, 'check_password_hash', counting_check)
+    return calls
+
+
+def test_successful_check_is_cached(stored_hash, kdf_calls):
+    assert hms._verify(stored_hash, 'secret')
+    assert hms._verify(stored_hash, 'secret')
+
+    assert len(kdf_calls) == 1
+
+
+def test_failed_check_is_not_cached(stored_hash, kdf_calls):
+    assert not hms._verify(stored_hash, 'wrong')
+    assert not hms._verify(stored_hash, 'wrong')
+
+    assert len(kdf_calls) == 2
+    assert len(hms._verified) == 0
+
+
+def test_cache_keeps_no_plaintext(stored_hash):
+    hms._verify(stored_hash, 'secret')
+
+    assert len(hms._verified) == 1
+    assert all(b'secret' not in digest for _, digest in hms._verified)
+
+
+def test_changed_hash_misses_the_cache(stored_hash, kdf_calls):
+    assert hms._verify(stored_hash, 'secret')
+    new_hash = generate_password_hash('secret', method='pbkdf2:sha256:1000')
+
+    assert hms._verify(new_hash, 'secret')
+    assert not hms._verify(new_hash, 'old-secret')
+    assert len(kdf_calls) == 3
+
+
+def test_bytes_secret_key_does_not_break_login(app, client, make_patient, monkeypatch):
+    make_patient()
+    monkeypatch.setitem(app.config, 'SECRET_KEY', b'bytes-secret-key')
+
+    response = client.post('/login', data={'username': 'patient', 'password': 'patient'})
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/dashboard')
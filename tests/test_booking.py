@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytest
+
+import app as hms
+
+
+def _book(client, when, department_id='1', treatment_id='2'):
+    return client.post('/book_appointment', data={
+        'department_id': department_id,
+        'treatment_id': treatment_id,
+        'appointment_datetime': when,
+    }, follow_redirects=True)
+
+
+def _appointment_count(app):
+    with app.app_context():
+        return hms.db.session.scalar(hms.db.select(hms.db.func.count()).select_from(hms.Appointment))
+
+
+def test_double_booking_keeps_one_row(app, client, login, make_patient):
+    make_patient()
+    login('patient')
+
+    first = _book(client, '2026-11-01T10:30')
+    second = _book(client, '2026-11-01T10:30')
+
+    assert 'Appointment booked successfully!' in first.get_data(as_text=True)
+    assert 'You already have an appointment booked for that time.' in second.get_data(as_text=True)
+    assert _appointment_count(app) == 1
+
+
+@pytest.mark.parametrize('when, expected', [
+    ('2026-11-01T10:30', datetime(2026, 11, 1, 10, 30)),
+    ('2026-11-01T10:30:15', datetime(2026, 11, 1, 10, 30, 15)),
+])
+def test_booking_accepts_datetime_local_values(app, client, login, make_patient, when, expected):
+    make_patient()
+    login('patient')
+
+    response = _book(client, when)
+
+    assert 'Appointment booked successfully!' in response.get_data(as_text=True)
+    with app.app_context():
+        assert hms.db.session.scalar(hms.db.select(hms.Appointment.appointment_datetime)) == expected
+
+
+@pytest.mark.parametrize('when', [
+    '2026-11-01',             # bare date
+    '2026-11-01T10:00+05:00', # UTC offset
+    '2026-W44-1T10:00',       # ISO week date
+    '2026-11-01 10:00',       # space separator
+    '2026-13-45T10:00',       # right shape, impossible date
+    'garbage',
+])
+def test_booking_rejects_other_datetime_formats(app, client, login, make_patient, when):
+    make_patient()
+    login('patient')
+
+    response = _book(client, when)
+
+    body = response.get_data(as_text=True)
+    assert 'Please choose a valid date and time.' in body
+    assert 'Failed to book appointment' not in body
+    assert _appointment_count(app) == 0
@@ -0,0 +1,71 @@
+import pytest
+
+import app as hms
+
+# Each dashboard must cost exactly this many queries however many appointments
+# it lists. With app.testing set, raiseload('*') also turns any lazy load the
+# dashboard queries didn't plan for into an error.
+ADMIN_QUERIES = 6   # totals, recent list, 4 selectin batches
+DOCTOR_QUERIES = 3  # user, appointments joined to treatment/department, patients.
+                    # The doctor's specialization comes from the identity map: the
+                    # appointments' joined departments include it.
+PATIENT_QUERIES = 3 # appointments, departments, treatments
+
+
+@pytest.mark.parametrize('count', [1, 6])
+def test_admin_dashboard_query_count(client, login, make_appointments, query_counter, count):
+    make_appointments(count, doctor=None)
+    login('admin')
+    query_counter.clear()
+
+    response = client.get('/dashboard')
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).count('Pat Ient (Patient)') == min(count, 5)
+    assert len(query_counter) == ADMIN_QUERIES
+
+
+@pytest.mark.parametrize('count', [1, 6])
+def test_doctor_dashboard_query_count(client, login, make_appointments, query_counter, count):
+    make_appointments(count)
+    login('doctor')
+    query_counter.clear()
+
+    response = client.get('/dashboard')
+
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert body.count('Patient: Pat Ient') == count
+    assert len(query_counter) == DOCTOR_QUERIES
+
+
+@pytest.mark.parametrize('count', [1, 6])
+def test_patient_dashboard_query_count(client, login, make_patient, make_appointments, query_counter, count):
+    make_patient()
+    make_appointments(count, patient='patient', doctor=None)
+    login('patient')
+    query_counter.clear()
+
+    response = client.get('/dashboard')
+
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert body.count('Doctor: Doc') == count
+    assert len(query_counter) == PATIENT_QUERIES
+
+
+# SQLite doesn't enforce foreign keys, so an appointment can outlive its treatment row
+def test_patient_dashboard_lists_appointments_with_missing_treatment(app, client, login, make_patient, make_appointments):
+    make_patient()
+    make_appointments(2, patient='patient')
+    with app.app_context():
+        hms.db.session.execute(hms.db.delete(hms.Treatment).where(hms.Treatment.id == 1))
+        hms.db.session.commit()
+    login('patient')
+
+    response = client.get('/dashboard')
+
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert body.count('Doctor: doctor') == 2
+    assert 'None' not in body
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import app as hms
+
+
+def _index_names(table):
+    return {ix['name'] for ix in hms.db.inspect(hms.db.engine).get_indexes(table)}
+
+
+# Databases created before the indexes were added to the models get them from upgrade_schema
+def test_upgrade_schema_adds_missing_indexes(app):
+    with app.app_context():
+        hms.db.session.execute(hms.db.text('DROP INDEX ix_appt_doctor_dt'))
+        hms.db.session.execute(hms.db.text('DROP INDEX ix_users_role_spec'))
+        hms.db.session.commit()
+        assert 'ix_appt_doctor_dt' not in _index_names('appointments')
+
+        hms.upgrade_schema()
+
+        assert 'ix_appt_doctor_dt' in _index_names('appointments')
+        assert 'ix_users_role_spec' in _index_names('users')
+
+
+def test_upgrade_schema_is_idempotent(app):
+    with app.app_context():
+        hms.upgrade_schema()
+        hms.upgrade_schema()
+
+        assert 'ix_appt_doctor_dt' in _index_names('appointments')
+
+
+# Double bookings made before uq_patient_slot existed are collapsed to the earliest one
+def test_upgrade_schema_removes_duplicate_bookings(app, make_patient):
+    patient_id = make_patient()
+    with app.app_context():
+        hms.db.session.execute(hms.db.text('DROP INDEX uq_patient_slot'))
+        for _ in range(2):
+            hms.db.session.add(hms.Appointment(
+                patient_id=patient_id, treatment_id=1, department_id=1,
+                appointment_datetime=datetime(2026, 11, 1, 10, 30), status='Booked'
+            ))
+        hms.db.session.commit()
+
+        hms.upgrade_schema()
+
+        ids = hms.db.session.scalars(hms.db.select(hms.Appointment.id)).all()
+        assert ids == [1]
+        assert 'uq_patient_slot' in _index_names('appointments')